@@ -8,11 +8,11 @@
 # - After initialization, the world X/Y/Z axes are fixed in space; they do not rotate
 #   with the phone. The phone's camera pose moves/rotates within this fixed frame.
 
+import math
 import time
 
 import numpy as np
 import rerun as rr
-import transforms3d as t3d
 from lerobot.model.kinematics import RobotKinematics
 from lerobot.processor import RobotAction, RobotObservation, RobotProcessorPipeline
 from lerobot.processor.converters import (
@@ -41,6 +41,16 @@ from teleop_android import (
     Pose,
     WristJoints,
 )
+from teleop_android._quat_kernels import (
+    mat2quat_xyzw,
+    quat_multiply_xyzw,
+    quat_rotate_xyzw,
+)
+from teleop_android.lerobot_utils import (
+    QUATERNION_FLU2RUB_POTRAIT_XYZW,
+    QUATERNION_RUB2FLU_XYZW,
+    TF_RUB2FLU,
+)
 
 #: Constants
 
@@ -87,11 +97,41 @@ XYZ_AXIS_NAMES = ["x", "y", "z"]
 RPY_AXIS_NAMES = ["roll", "pitch", "yaw"]
 XYZ_AXIS_COLORS = [[(231, 76, 60), (39, 174, 96), (52, 120, 219)]]
 
-TF_RUB2FLU = np.array([[0, 0, -1, 0], [-1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
-TF_XYZW_TO_WXYZ = np.array([[0, 0, 0, 1], [1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0]])
-TF_WXYZ_TO_XYZW = np.array([[0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1], [1, 0, 0, 0]])
 
-ORIENTATION_POTRAIT = t3d.euler.euler2mat(-np.pi / 2, 0, 0, "sxyz")
+#: Helpers
+
+
+def quat_to_euler_sxyz_xyzw(q) -> tuple[float, float, float]:
+    """
+    Convert a unit quaternion [x, y, z, w] to static "sxyz" Euler angles (roll, pitch, yaw).
+
+    Direct quaternion to Euler conversion, without going through the rotation matrix.
+    REFS: Bernardes, Viollet, "Quaternion to Euler angles conversion: A direct, general
+    and computationally efficient method", PLoS ONE, 2022.
+    """
+    x, y, z, w = q
+    # Tait-Bryan sequence (1, 2, 3): i=x, j=y, k=z
+    a = w - y
+    b = x + z
+    c = w + y
+    d = z - x
+
+    pitch = 2.0 * math.atan2(math.hypot(c, d), math.hypot(a, b))
+    half_sum = math.atan2(b, a)
+    half_diff = math.atan2(d, c)
+
+    # Gimbal lock, only the sum (or the difference) of roll and yaw is defined
+    if abs(pitch) <= 1e-7:
+        roll, yaw = 2.0 * half_sum, 0.0
+    elif abs(pitch - math.pi) <= 1e-7:
+        roll, yaw = -2.0 * half_diff, 0.0
+    else:
+        roll, yaw = half_sum - half_diff, half_sum + half_diff
+
+    # Wrap roll and yaw to [-pi, pi)
+    roll = (roll + math.pi) % (2.0 * math.pi) - math.pi
+    yaw = (yaw + math.pi) % (2.0 * math.pi) - math.pi
+    return roll, pitch - math.pi / 2, yaw
 
 
 #: Init Rerun
@@ -197,57 +237,59 @@ config_teleop_device.camera_offset = np.array([0.0, -0.02, 0.1])
 teleop_device = AndroidPhone(config=config_teleop_device)
 
 
+# Scratch buffers reused by every pose callback, Rerun copies the data when logging
+_position_rub_buf = np.empty(3)
+_position_buf = np.empty(3)
+_quaternion_buf = np.empty(4)
+_euler_buf = np.empty(3)
+
+
 def callback_pose_android(message: Pose) -> None:
     # Data from ARCore is in RUB coordinate system
     position_rub = message["position"]
     orientation_rub = message["orientation"]
-    position_rub = np.array([position_rub["x"], position_rub["y"], position_rub["z"]])
-    orientation_rub_quaternion_wxyz = np.array(
-        [
-            orientation_rub["w"],
-            orientation_rub["x"],
-            orientation_rub["y"],
-            orientation_rub["z"],
-        ]
+    _position_rub_buf[0] = position_rub["x"]
+    _position_rub_buf[1] = position_rub["y"]
+    _position_rub_buf[2] = position_rub["z"]
+    orientation_rub_quaternion_xyzw = (
+        orientation_rub["x"],
+        orientation_rub["y"],
+        orientation_rub["z"],
+        orientation_rub["w"],
     )
-    # This rotates a vector expressed in RUB phone coordinates into the RUB world coordinate
-    orientation_rub_matrix = t3d.quaternions.quat2mat(orientation_rub_quaternion_wxyz)
 
-    # Transform data RUB to FLU coordinate system
-    position_camera_flu = TF_RUB2FLU[:3, :3] @ position_rub
-    orientation_flu_matrix = (
-        TF_RUB2FLU[:3, :3] @ orientation_rub_matrix @ TF_RUB2FLU[:3, :3].T
+    # Transform data RUB to FLU coordinate system, and rotate by -90 degrees around
+    # x-axis to account for portrait mode:
+    #   q_flu = q_rub2flu * q_rub * q_rub2flu^-1 * q_potrait
+    np.matmul(TF_RUB2FLU[:3, :3], _position_rub_buf, out=_position_buf)
+    orientation_flu_quaternion_xyzw = quat_multiply_xyzw(
+        quat_multiply_xyzw(QUATERNION_RUB2FLU_XYZW, orientation_rub_quaternion_xyzw),
+        QUATERNION_FLU2RUB_POTRAIT_XYZW,
     )
-    # Rotate by -90 degrees around x-axis to account for portrait mode
-    orientation_flu_matrix = orientation_flu_matrix @ ORIENTATION_POTRAIT
 
     # Compensate for camera offset: ARCore reports camera position, but we want phone bottom position
     # camera_offset is in the phone FLU frame
-    camera_offset_world = orientation_flu_matrix @ config_teleop_device.camera_offset
-    position_phone_flu = position_camera_flu - camera_offset_world
-
-    pose_flu = t3d.affines.compose(
-        position_phone_flu, orientation_flu_matrix, [1, 1, 1]
+    camera_offset_world = quat_rotate_xyzw(
+        orientation_flu_quaternion_xyzw, config_teleop_device.camera_offset
     )
+    np.subtract(_position_buf, camera_offset_world, out=_position_buf)
+    _quaternion_buf[:] = orientation_flu_quaternion_xyzw
 
     # forward, left, up -> roll, pitch, yaw
-    orientation_flu_euler = np.degrees(
-        np.array(t3d.euler.mat2euler(pose_flu[:3, :3], axes="sxyz"))
-    )
-    orientation_flu_quaternion_wxyz = t3d.quaternions.mat2quat(pose_flu[:3, :3])
-    orientation_flu_quaternion_xyzw = TF_WXYZ_TO_XYZW @ orientation_flu_quaternion_wxyz
+    _euler_buf[:] = quat_to_euler_sxyz_xyzw(orientation_flu_quaternion_xyzw)
+    np.degrees(_euler_buf, out=_euler_buf)
 
-    rr.log("/position", rr.Scalars(pose_flu[:3, 3]))
-    rr.log("/orientation", rr.Scalars(orientation_flu_euler))
+    rr.log("/position", rr.Scalars(_position_buf))
+    rr.log("/orientation", rr.Scalars(_euler_buf))
     rr.log(
         "/world_phone/trajectory_phone",
-        rr.Points3D([pose_flu[:3, 3]]),
+        rr.Points3D([_position_buf]),
     )
     rr.log(
         "/world_phone/phone",
         rr.Transform3D(
-            translation=pose_flu[:3, 3],
-            rotation=rr.Quaternion(xyzw=orientation_flu_quaternion_xyzw),
+            translation=_position_buf,
+            rotation=rr.Quaternion(xyzw=_quaternion_buf),
         ),
     )
 
@@ -293,12 +335,7 @@ while True:
     orientation_lower_arm_matrix = pose_lower_arm[:3, :3]
 
     # Convert rotation matrix to quaternion (xyzw format for Rerun)
-    orientation_lower_arm_quaternion_wxyz = t3d.quaternions.mat2quat(
-        orientation_lower_arm_matrix
-    )
-    orientation_lower_arm_quaternion_xyzw = (
-        TF_WXYZ_TO_XYZW @ orientation_lower_arm_quaternion_wxyz
-    )
+    orientation_lower_arm_quaternion_xyzw = mat2quat_xyzw(orientation_lower_arm_matrix)
 
     # Log lower arm frame transform
     rr.log(
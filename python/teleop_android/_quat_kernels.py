@@ -0,0 +1,136 @@
+# Quaternion and rotation matrix kernels, specialized for the conventions used in this package.
+# They replace the generic `transforms3d` functions, which pay for input validation and axes
+# string handling on every call. Quaternions are [w, x, y, z], as in `transforms3d`, except
+# for the `_xyzw` functions which use the [x, y, z, w] order of LeRobot's `Rotation`.
+
+import math
+
+import numpy as np
+
+#:
+
+_EPS4 = np.finfo(float).eps * 4.0
+
+#:
+
+
+def quat2mat(q) -> np.ndarray:
+    """
+    Convert a quaternion [w, x, y, z] to a 3x3 rotation matrix, same as
+    `t3d.quaternions.quat2mat(q)`. The quaternion does not need to be normalized.
+    """
+    w, x, y, z = np.asarray(q).tolist()
+    n = w * w + x * x + y * y + z * z
+    if n < _EPS4:
+        return np.eye(3)
+    s = 2.0 / n
+    xs, ys, zs = x * s, y * s, z * s
+    wx, wy, wz = w * xs, w * ys, w * zs
+    xx, xy, xz = x * xs, x * ys, x * zs
+    yy, yz, zz = y * ys, y * zs, z * zs
+    return np.array(
+        [
+            [1.0 - (yy + zz), xy - wz, xz + wy],
+            [xy + wz, 1.0 - (xx + zz), yz - wx],
+            [xz - wy, yz + wx, 1.0 - (xx + yy)],
+        ]
+    )
+
+
+def mat2quat(R) -> np.ndarray:
+    """
+    Convert a 3x3 rotation matrix to a quaternion [w, x, y, z], with w >= 0.
+
+    Shepperd's method, branching on the largest of the trace and the diagonal elements.
+    Unlike `t3d.quaternions.mat2quat` it assumes R is a proper rotation matrix, so there
+    is no eigendecomposition.
+    """
+    (r00, r01, r02), (r10, r11, r12), (r20, r21, r22) = np.asarray(R).tolist()
+    trace = r00 + r11 + r22
+    if trace > 0.0:
+        s = 0.5 / math.sqrt(trace + 1.0)
+        w = 0.25 / s
+        x = (r21 - r12) * s
+        y = (r02 - r20) * s
+        z = (r10 - r01) * s
+    elif r00 > r11 and r00 > r22:
+        s = 2.0 * math.sqrt(1.0 + r00 - r11 - r22)
+        w = (r21 - r12) / s
+        x = 0.25 * s
+        y = (r01 + r10) / s
+        z = (r02 + r20) / s
+    elif r11 > r22:
+        s = 2.0 * math.sqrt(1.0 + r11 - r00 - r22)
+        w = (r02 - r20) / s
+        x = (r01 + r10) / s
+        y = 0.25 * s
+        z = (r12 + r21) / s
+    else:
+        s = 2.0 * math.sqrt(1.0 + r22 - r00 - r11)
+        w = (r10 - r01) / s
+        x = (r02 + r20) / s
+        y = (r12 + r21) / s
+        z = 0.25 * s
+    if w < 0.0:
+        return np.array([-w, -x, -y, -z])
+    return np.array([w, x, y, z])
+
+
+def mat2quat_xyzw(R) -> np.ndarray:
+    """Same as `mat2quat`, returning the quaternion as [x, y, z, w]."""
+    return mat2quat(R)[[1, 2, 3, 0]]
+
+
+def euler2mat_sxyz(ai: float, aj: float, ak: float) -> np.ndarray:
+    """
+    Convert static "sxyz" Euler angles (roll, pitch, yaw) to a 3x3 rotation matrix, same
+    as `t3d.euler.euler2mat(ai, aj, ak, axes="sxyz")`.
+    """
+    si, sj, sk = math.sin(ai), math.sin(aj), math.sin(ak)
+    ci, cj, ck = math.cos(ai), math.cos(aj), math.cos(ak)
+    cc, cs = ci * ck, ci * sk
+    sc, ss = si * ck, si * sk
+    return np.array(
+        [
+            [cj * ck, sj * sc - cs, sj * cc + ss],
+            [cj * sk, sj * ss + cc, sj * cs - sc],
+            [-sj, cj * si, cj * ci],
+        ]
+    )
+
+
+def quat_multiply_xyzw(q1, q2) -> np.ndarray:
+    """Hamilton product q1 * q2 of two quaternions [x, y, z, w] (apply q2 first, then q1)."""
+    x1, y1, z1, w1 = np.asarray(q1).tolist()
+    x2, y2, z2, w2 = np.asarray(q2).tolist()
+    return np.array(
+        [
+            w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+            w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+            w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+            w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        ]
+    )
+
+
+def quat_conjugate_xyzw(q) -> np.ndarray:
+    """Conjugate of a quaternion [x, y, z, w], the inverse rotation for unit quaternions."""
+    x, y, z, w = np.asarray(q).tolist()
+    return np.array([-x, -y, -z, w])
+
+
+def quat_rotate_xyzw(q, v) -> np.ndarray:
+    """Rotate the 3D vector v by the unit quaternion q [x, y, z, w]."""
+    x, y, z, w = np.asarray(q).tolist()
+    vx, vy, vz = np.asarray(v).tolist()
+    # v' = v + w * t + u x t, with u = [x, y, z] and t = 2 * (u x v)
+    tx = 2.0 * (y * vz - z * vy)
+    ty = 2.0 * (z * vx - x * vz)
+    tz = 2.0 * (x * vy - y * vx)
+    return np.array(
+        [
+            vx + w * tx + y * tz - z * ty,
+            vy + w * ty + z * tx - x * tz,
+            vz + w * tz + x * ty - y * tx,
+        ]
+    )
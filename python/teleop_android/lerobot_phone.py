@@ -8,18 +8,19 @@ import time
 from typing import Optional
 
 import numpy as np
-import transforms3d as t3d
 from lerobot.teleoperators.phone.teleop_phone import BasePhone, PhoneConfig
 from lerobot.teleoperators.teleoperator import Teleoperator
 from lerobot.utils.errors import DeviceAlreadyConnectedError, DeviceNotConnectedError
 from lerobot.utils.rotation import Rotation
 
+from ._quat_kernels import quat_conjugate_xyzw, quat_multiply_xyzw, quat_rotate_xyzw
 from .lerobot_utils import (
-    ORIENTATION_POTRAIT,
+    QUATERNION_FLU2RUB_POTRAIT_XYZW,
+    QUATERNION_RUB2FLU_XYZW,
     TF_RUB2FLU,
-    are_close,
-    interpolate_transforms,
-    matrix_t3d_to_rotation,
+    RigidPose,
+    are_close_pose,
+    interpolate_poses,
 )
 from .server import Control, Pose, TeleopServer
 
@@ -54,8 +55,8 @@ class AndroidPhone(BasePhone, Teleoperator):
 
         # Store initial phone pose when user starts touching (used as reference for relative movement)
         # Reset to None when user stops touching or when pose jump is detected
-        self._pose_phone_init = None
-        self._pose_phone_prev = None
+        self._pose_phone_init: Optional[RigidPose] = None
+        self._pose_phone_prev: Optional[RigidPose] = None
         # Store initial control pad Y position to calculate relative gripper movement
         # Reset to None when user stops touching or when pose jump is detected
         self._y_control_pad_init: Optional[float] = None
@@ -130,40 +131,44 @@ class AndroidPhone(BasePhone, Teleoperator):
                 pose["position"]["x"],
                 pose["position"]["y"],
                 pose["position"]["z"],
-            ]
+            ],
+            dtype=float,
         )
-        orientation_rub_quaternion_wxyz = np.array(
+        # This represents the phone's frame relative to the world frame.
+        # I.e. transforms a vector in (RUB) phone coordinates to a vector in (RUB) world coordinates.
+        orientation_rub_quaternion_xyzw = np.array(
             [
-                pose["orientation"]["w"],
                 pose["orientation"]["x"],
                 pose["orientation"]["y"],
                 pose["orientation"]["z"],
-            ]
+                pose["orientation"]["w"],
+            ],
+            dtype=float,
         )
-
-        # This represents the phone's frame relative to the world frame.
-        # I.e. transforms a vector in (RUB) phone coordinates to a vector in (RUB) world coordinates.
-        orientation_rub_matrix = t3d.quaternions.quat2mat(
-            orientation_rub_quaternion_wxyz
+        orientation_rub_quaternion_xyzw /= np.linalg.norm(
+            orientation_rub_quaternion_xyzw
         )
 
         control_pad_y = float(control.get("y", 0.0))
 
-        # Transform RUB (used by ARCore) to FLU (used by LeRobot) coordinate system
+        # Transform RUB (used by ARCore) to FLU (used by LeRobot) coordinate system, and
+        # rotate by -90 degrees around x-axis to account for portrait mode
         position_camera = TF_RUB2FLU[:3, :3] @ position_rub
-        orientation_matrix = (
-            TF_RUB2FLU[:3, :3] @ orientation_rub_matrix @ TF_RUB2FLU[:3, :3].T
+        orientation_quaternion_xyzw = quat_multiply_xyzw(
+            quat_multiply_xyzw(
+                QUATERNION_RUB2FLU_XYZW, orientation_rub_quaternion_xyzw
+            ),
+            QUATERNION_FLU2RUB_POTRAIT_XYZW,
         )
-        # Rotate by -90 degrees around x-axis to account for portrait mode
-        orientation_matrix = orientation_matrix @ ORIENTATION_POTRAIT
 
         # Compensate for camera offset: ARCore reports camera position, but we want phone bottom position
         # camera_offset is in phone's local FLU frame, so rotate it to world frame
-        camera_offset_world = orientation_matrix @ self.config.camera_offset
+        camera_offset_world = quat_rotate_xyzw(
+            orientation_quaternion_xyzw, self.config.camera_offset
+        )
         position_phone = position_camera - camera_offset_world
 
-        # Create 4x4 pose matrix, combining position, orientation, and scale
-        pose_phone = t3d.affines.compose(position_phone, orientation_matrix, [1, 1, 1])
+        pose_phone = RigidPose(position_phone, orientation_quaternion_xyzw)
 
         ##: Handle edge cases
 
@@ -187,7 +192,7 @@ class AndroidPhone(BasePhone, Teleoperator):
 
         # Pose jump protection
         if self._pose_phone_prev is not None:
-            if not are_close(
+            if not are_close_pose(
                 pose_phone,
                 self._pose_phone_prev,
                 lin_tol=0.05,
@@ -215,22 +220,22 @@ class AndroidPhone(BasePhone, Teleoperator):
         ##: Compute deltas
 
         if scale < 1.0:
-            pose_phone = interpolate_transforms(
-                self._pose_phone_init, pose_phone, scale
-            )
+            pose_phone = interpolate_poses(self._pose_phone_init, pose_phone, scale)
 
-        delta_position = pose_phone[:3, 3] - self._pose_phone_init[:3, 3]
-        delta_orientation = self._pose_phone_init[:3, :3].T @ pose_phone[:3, :3]
+        delta_position = pose_phone.t - self._pose_phone_init.t
+        delta_orientation = quat_multiply_xyzw(
+            quat_conjugate_xyzw(self._pose_phone_init.q_xyzw), pose_phone.q_xyzw
+        )
         delta_y_control_pad = control_pad_y - self._y_control_pad_init
 
         ##: Convert to LeRobot data
         # See `lerobot_processors.py` for how this data is used. We tried as much as possible
         # to stick to LeRobot's original phone teleop implementation.
 
-        rot = matrix_t3d_to_rotation(delta_orientation)
+        rot = Rotation.from_quat(delta_orientation)
         pos = delta_position
 
-        orientation_phone = matrix_t3d_to_rotation(pose_phone[:3, :3])
+        orientation_phone = pose_phone.to_rotation()
 
         raw_inputs = control.copy()
         raw_inputs["delta_y_control_pad"] = delta_y_control_pad
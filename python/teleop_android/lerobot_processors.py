@@ -13,8 +13,9 @@ from lerobot.processor import (
 )
 from lerobot.utils.rotation import Rotation
 
+from ._quat_kernels import mat2quat_xyzw
 from .lerobot_utils import (
-    compute_wrist_deltas_from_phone_and_arm,
+    compute_wrist_deltas_from_quaternions,
 )
 
 #: MapPhoneActionToRobotAction
@@ -131,6 +132,7 @@ class WristJoints(RobotActionProcessorStep):
     motor_names: list[str]
     kinematics: RobotKinematics
 
+    # Latched orientations, as quaternions [x, y, z, w]
     orientation_lower_arm_init: np.ndarray | None = field(
         default=None, init=False, repr=False
     )
@@ -165,8 +167,9 @@ class WristJoints(RobotActionProcessorStep):
 
         orientation_phone = Rotation.from_rotvec(
             [phone_wx, phone_wy, phone_wz]
-        ).as_matrix()
+        ).as_quat()
         pose_lower_arm = self._compute_pose_lower_arm(observation)
+        orientation_lower_arm = mat2quat_xyzw(pose_lower_arm[:3, :3])
         pos_wrist_desired = None
 
         if enabled:
@@ -177,13 +180,13 @@ class WristJoints(RobotActionProcessorStep):
                 or self.orientation_phone_init is None
                 or self.pos_wrist_init is None
             ):
-                self.orientation_lower_arm_init = pose_lower_arm[:3, :3]
+                self.orientation_lower_arm_init = orientation_lower_arm
                 self.orientation_phone_init = orientation_phone
                 self.pos_wrist_init = pos_wrist_obs
 
-            rad_delta_pitch, rad_delta_roll = compute_wrist_deltas_from_phone_and_arm(
+            rad_delta_pitch, rad_delta_roll = compute_wrist_deltas_from_quaternions(
                 orientation_phone,
-                pose_lower_arm[:3, :3],
+                orientation_lower_arm,
                 self.orientation_phone_init,
                 self.orientation_lower_arm_init,
             )
@@ -1,20 +1,58 @@
 import math
+from typing import NamedTuple, Optional
 
 import numpy as np
-import transforms3d as t3d
 from lerobot.utils.rotation import Rotation
 
+from ._quat_kernels import (
+    euler2mat_sxyz,
+    mat2quat,
+    mat2quat_xyzw,
+    quat2mat,
+    quat_conjugate_xyzw,
+    quat_multiply_xyzw,
+)
+
 #:
 
 TF_RUB2FLU = np.array([[0, 0, -1, 0], [-1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
-TF_XYZW_TO_WXYZ = np.array([[0, 0, 0, 1], [1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0]])
-TF_WXYZ_TO_XYZW = np.array([[0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1], [1, 0, 0, 0]])
 
-ORIENTATION_POTRAIT = t3d.euler.euler2mat(-np.pi / 2, 0, 0, "sxyz")
+ORIENTATION_POTRAIT = euler2mat_sxyz(-np.pi / 2, 0, 0)
+# Right-hand side of the RUB to FLU change of basis, followed by the portrait correction
+ORIENTATION_FLU2RUB_POTRAIT = TF_RUB2FLU[:3, :3].T @ ORIENTATION_POTRAIT
+# Same rotations as quaternions [x, y, z, w], for `RigidPose`
+QUATERNION_RUB2FLU_XYZW = mat2quat_xyzw(TF_RUB2FLU[:3, :3])
+QUATERNION_FLU2RUB_POTRAIT_XYZW = mat2quat_xyzw(ORIENTATION_FLU2RUB_POTRAIT)
 
 #:
 
 
+class RigidPose(NamedTuple):
+    """
+    Rigid transform stored as a translation and a unit quaternion, instead of a 4x4 matrix.
+
+    Convert with `to_matrix` only where a 4x4 matrix is actually required.
+    """
+
+    t: np.ndarray
+    """Translation (3,)"""
+    q_xyzw: np.ndarray
+    """Orientation as a unit quaternion [x, y, z, w], same order as LeRobot's `Rotation` (4,)"""
+
+    @classmethod
+    def from_matrix(cls, T) -> "RigidPose":
+        return cls(np.array(T[:3, 3], dtype=float), mat2quat_xyzw(T[:3, :3]))
+
+    def to_matrix(self) -> np.ndarray:
+        T = np.eye(4)
+        T[:3, :3] = quat2mat(self.q_xyzw[[3, 0, 1, 2]])
+        T[:3, 3] = self.t
+        return T
+
+    def to_rotation(self) -> Rotation:
+        return Rotation.from_quat(self.q_xyzw)
+
+
 def are_close(a, b=None, lin_tol=1e-9, ang_tol=1e-9):
     """
     Check if two transformation matrices are close to each other within specified tolerances.
@@ -25,21 +63,58 @@ def are_close(a, b=None, lin_tol=1e-9, ang_tol=1e-9):
         a (numpy.ndarray): The first transformation matrix.
         b (numpy.ndarray, optional): The second transformation matrix. If not provided, it defaults to the identity matrix.
         lin_tol (float, optional): The linear tolerance for closeness. Defaults to 1e-9.
-        ang_tol (float, optional): The angular tolerance for closeness. Defaults to 1e-9.
+        ang_tol (float, optional): The angular tolerance for closeness, on the angle of the relative rotation. Defaults to 1e-9.
 
     Returns:
         bool: True if the matrices are close, False otherwise.
     """
     if b is None:
         b = np.eye(4)
-    d = np.linalg.inv(a) @ b
-    if not np.allclose(d[:3, 3], np.zeros(3), atol=lin_tol):
+    # Rigid transforms, the translation distance is the same in both frames
+    d_trans = a[:3, 3] - b[:3, 3]
+    if d_trans @ d_trans > lin_tol * lin_tol:
+        return False
+    # Angle of the relative rotation D = R_a^T @ R_b, from sin(theta) = |vee(D - D^T)| / 2
+    # and cos(theta) = (trace(D) - 1) / 2. Unlike the trace alone, this stays accurate
+    # for small angles.
+    (d00, d01, d02), (d10, d11, d12), (d20, d21, d22) = (
+        a[:3, :3].T @ b[:3, :3]
+    ).tolist()
+    sin_theta = 0.5 * math.hypot(d21 - d12, d02 - d20, d10 - d01)
+    cos_theta = 0.5 * (d00 + d11 + d22 - 1.0)
+    return math.atan2(sin_theta, cos_theta) <= ang_tol
+
+
+def are_close_pose(
+    a: RigidPose, b: Optional[RigidPose] = None, lin_tol=1e-9, ang_tol=1e-9
+) -> bool:
+    """
+    Check if two poses are close to each other within specified tolerances.
+
+    Same as `are_close`, for poses stored as `RigidPose`.
+
+    Parameters:
+        a (RigidPose): The first pose.
+        b (RigidPose, optional): The second pose. If not provided, it defaults to the identity.
+        lin_tol (float, optional): The linear tolerance for closeness. Defaults to 1e-9.
+        ang_tol (float, optional): The angular tolerance for closeness, on the angle of the relative rotation. Defaults to 1e-9.
+
+    Returns:
+        bool: True if the poses are close, False otherwise.
+    """
+    if b is None:
+        d_trans = a.t
+        x, y, z, _ = a.q_xyzw.tolist()
+    else:
+        d_trans = a.t - b.t
+        x, y, z, _ = quat_multiply_xyzw(
+            quat_conjugate_xyzw(a.q_xyzw), b.q_xyzw
+        ).tolist()
+    if d_trans @ d_trans > lin_tol * lin_tol:
         return False
-    yaw = math.atan2(d[1, 0], d[0, 0])
-    pitch = math.asin(-d[2, 0])
-    roll = math.atan2(d[2, 1], d[2, 2])
-    rpy = np.array([roll, pitch, yaw])
-    return np.allclose(rpy, np.zeros(3), atol=ang_tol)
+    # The vector part of the relative rotation q_a^-1 * q_b has norm sin(theta / 2), exact
+    # for small angles and the same for q and -q
+    return math.hypot(x, y, z) <= math.sin(ang_tol / 2.0)
 
 
 def slerp(q1, q2, t):
@@ -48,29 +123,53 @@ def slerp(q1, q2, t):
 
     REFS: https://github.com/SpesRobotics/teleop/blob/main/teleop/__init__.py
     """
-    q1 = q1 / np.linalg.norm(q1)
-    q2 = q2 / np.linalg.norm(q2)
-
-    dot = np.dot(q1, q2)
+    # Quaternions are 4-vectors, scalar math is much cheaper than numpy dispatches here.
+    # Norms use the n-dimensional math.hypot, which is correctly rounded and avoids
+    # overflow in the sum of squares.
+    w1, x1, y1, z1 = q1
+    w2, x2, y2, z2 = q2
+
+    # Normalization, dot product and shortest path sign are folded into a single scale
+    # per quaternion, applied once
+    inv1 = 1.0 / math.hypot(w1, x1, y1, z1)
+    inv2 = 1.0 / math.hypot(w2, x2, y2, z2)
+    dot = (w1 * w2 + x1 * x2 + y1 * y2 + z1 * z2) * inv1 * inv2
 
     # If the dot product is negative, use the shortest path
     if dot < 0.0:
-        q2 = -q2
+        inv2 = -inv2
         dot = -dot
 
+    w1, x1, y1, z1 = w1 * inv1, x1 * inv1, y1 * inv1, z1 * inv1
+    w2, x2, y2, z2 = w2 * inv2, x2 * inv2, y2 * inv2, z2 * inv2
+
+    # Endpoints
+    if t == 0.0:
+        return np.array([w1, x1, y1, z1])
+    if t == 1.0:
+        return np.array([w2, x2, y2, z2])
+
     DOT_THRESHOLD = 0.9995
     if dot > DOT_THRESHOLD:
         # Linear interpolation fallback for nearly identical quaternions
-        result = q1 + t * (q2 - q1)
-        return result / np.linalg.norm(result)
-
-    theta_0 = np.arccos(dot)
+        w = w1 + t * (w2 - w1)
+        x = x1 + t * (x2 - x1)
+        y = y1 + t * (y2 - y1)
+        z = z1 + t * (z2 - z1)
+        inv = 1.0 / math.hypot(w, x, y, z)
+        return np.array([w * inv, x * inv, y * inv, z * inv])
+
+    theta_0 = math.acos(dot)
     theta = theta_0 * t
 
-    q3 = q2 - q1 * dot
-    q3 = q3 / np.linalg.norm(q3)
+    w3, x3, y3, z3 = w2 - w1 * dot, x2 - x1 * dot, y2 - y1 * dot, z2 - z1 * dot
+    n3 = math.hypot(w3, x3, y3, z3)
 
-    return q1 * np.cos(theta) + q3 * np.sin(theta)
+    c = math.cos(theta)
+    s = math.sin(theta) / n3
+    return np.array(
+        [w1 * c + w3 * s, x1 * c + x3 * s, y1 * c + y3 * s, z1 * c + z3 * s]
+    )
 
 
 def interpolate_transforms(T1, T2, alpha):
@@ -90,6 +189,12 @@ def interpolate_transforms(T1, T2, alpha):
     assert T1.shape == (4, 4) and T2.shape == (4, 4)
     assert 0.0 <= alpha <= 1.0
 
+    # Endpoints, no need to go through the quaternions
+    if alpha == 0.0:
+        return T1.copy()
+    if alpha == 1.0:
+        return T2.copy()
+
     # Translation
     t1 = T1[:3, 3]
     t2 = T2[:3, 3]
@@ -98,12 +203,12 @@ def interpolate_transforms(T1, T2, alpha):
     # Rotation
     R1 = T1[:3, :3]
     R2 = T2[:3, :3]
-    q1 = t3d.quaternions.mat2quat(R1)
-    q2 = t3d.quaternions.mat2quat(R2)
+    q1 = mat2quat(R1)
+    q2 = mat2quat(R2)
 
     # SLERP
     q_interp = slerp(q1, q2, alpha)
-    R_interp = t3d.quaternions.quat2mat(q_interp)
+    R_interp = quat2mat(q_interp)
 
     # Final transform
     T_interp = np.eye(4)
@@ -113,10 +218,95 @@ def interpolate_transforms(T1, T2, alpha):
     return T_interp
 
 
+def interpolate_transforms_batch(T1, T2, alphas):
+    """
+    Interpolate between two 4x4 transformation matrices at several interpolation factors.
+
+    Batched version of `interpolate_transforms`, e.g. to resample a trajectory segment.
+
+    Args:
+        T1 (np.ndarray): Start transform (4x4)
+        T2 (np.ndarray): End transform (4x4)
+        alphas (np.ndarray): Interpolation factors in [0, 1] (N,)
+
+    Returns:
+        np.ndarray: Interpolated transforms (N, 4, 4)
+    """
+    alphas = np.asarray(alphas, dtype=float)
+    assert T1.shape == (4, 4) and T2.shape == (4, 4)
+    assert alphas.ndim == 1 and np.all((0.0 <= alphas) & (alphas <= 1.0))
+
+    # Rotation, the shortest path is picked once for all alphas
+    q1 = mat2quat(T1[:3, :3])
+    q2 = mat2quat(T2[:3, :3])
+    dot = float(q1 @ q2)
+    if dot < 0.0:
+        q2 = -q2
+        dot = -dot
+
+    DOT_THRESHOLD = 0.9995
+    if dot > DOT_THRESHOLD:
+        # Linear interpolation fallback for nearly identical quaternions
+        q_interp = q1 + alphas[:, None] * (q2 - q1)
+        q_interp /= np.linalg.norm(q_interp, axis=1, keepdims=True)
+    else:
+        theta_0 = math.acos(dot)
+        sin_theta_0 = math.sin(theta_0)
+        w1 = np.sin((1.0 - alphas) * theta_0) / sin_theta_0
+        w2 = np.sin(alphas * theta_0) / sin_theta_0
+        q_interp = w1[:, None] * q1 + w2[:, None] * q2
+
+    # Final transforms, quaternion to rotation matrix over the whole batch
+    w, x, y, z = q_interp.T
+    T_interp = np.zeros((len(alphas), 4, 4))
+    T_interp[:, 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+    T_interp[:, 0, 1] = 2.0 * (x * y - w * z)
+    T_interp[:, 0, 2] = 2.0 * (x * z + w * y)
+    T_interp[:, 1, 0] = 2.0 * (x * y + w * z)
+    T_interp[:, 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+    T_interp[:, 1, 2] = 2.0 * (y * z - w * x)
+    T_interp[:, 2, 0] = 2.0 * (x * z - w * y)
+    T_interp[:, 2, 1] = 2.0 * (y * z + w * x)
+    T_interp[:, 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+    t1 = T1[:3, 3]
+    t2 = T2[:3, 3]
+    T_interp[:, :3, 3] = (1.0 - alphas)[:, None] * t1 + alphas[:, None] * t2
+    T_interp[:, 3, 3] = 1.0
+
+    return T_interp
+
+
+def interpolate_poses(p1: RigidPose, p2: RigidPose, alpha: float) -> RigidPose:
+    """
+    Interpolate between two poses using SLERP + linear translation.
+
+    Same as `interpolate_transforms`, for poses stored as `RigidPose`.
+
+    Args:
+        p1 (RigidPose): Start pose
+        p2 (RigidPose): End pose
+        alpha (float): Interpolation factor [0, 1]
+
+    Returns:
+        RigidPose: Interpolated pose
+    """
+    assert 0.0 <= alpha <= 1.0
+
+    # Endpoints
+    if alpha == 0.0:
+        return RigidPose(p1.t.copy(), p1.q_xyzw.copy())
+    if alpha == 1.0:
+        return RigidPose(p2.t.copy(), p2.q_xyzw.copy())
+
+    t_interp = (1 - alpha) * p1.t + alpha * p2.t
+    # SLERP does not depend on the order of the quaternion components
+    q_interp = slerp(p1.q_xyzw, p2.q_xyzw, alpha)
+    return RigidPose(t_interp, q_interp)
+
+
 def matrix_t3d_to_rotation(orientation_matrix) -> Rotation:
-    orientation_quaternion_wxyz = t3d.quaternions.mat2quat(orientation_matrix)
-    orientation_quaternion_xyzw = TF_WXYZ_TO_XYZW @ orientation_quaternion_wxyz
-    return Rotation.from_quat(orientation_quaternion_xyzw)
+    """Convert a 3x3 rotation matrix to LeRobot's `Rotation`."""
+    return Rotation.from_quat(mat2quat_xyzw(orientation_matrix))
 
 
 def compute_wrist_deltas_from_phone_and_arm(
@@ -151,17 +341,71 @@ def compute_wrist_deltas_from_phone_and_arm(
     )
 
     # Extract pitch and roll using wrist joint convention (relative to arm).
-    # Using "syzx" avoid gimbal lock on pitch and roll.
-    rad_delta_pitch, rad_delta_yaw, rad_delta_roll = t3d.euler.mat2euler(
-        orientation_matrix_delta, axes="syzx"
+    # Only the matrix elements needed by the angles are read.
+    (m00, m01, m02), (_, m11, _), (_, m21, _) = orientation_matrix_delta.tolist()
+    return _wrist_deltas_syzx(m00, m01, m02, m11, m21)
+
+
+def compute_wrist_deltas_from_quaternions(
+    quaternion_phone_xyzw: np.ndarray,
+    quaternion_arm_xyzw: np.ndarray,
+    quaternion_phone_init_xyzw: np.ndarray,
+    quaternion_arm_init_xyzw: np.ndarray,
+) -> tuple[float, float]:
+    """
+    Compute wrist flex and roll angles from phone and arm rotations.
+
+    Same as `compute_wrist_deltas_from_phone_and_arm`, for unit quaternions [x, y, z, w].
+
+    Args:
+        quaternion_phone_xyzw: Current phone rotation in world frame (4,)
+        quaternion_arm_xyzw: Current lower arm rotation in world frame (4,)
+        quaternion_phone_init_xyzw: Initial phone rotation in world frame (4,)
+        quaternion_arm_init_xyzw: Initial lower arm rotation in world frame (4,)
+
+    Returns:
+        (rad_delta_pitch, rad_delta_roll): Wrist delta angles in radians
+    """
+    # Compute phone's orientation in the lower arm frame coordinates
+    quaternion_phone_to_arm = quat_multiply_xyzw(
+        quat_conjugate_xyzw(quaternion_arm_xyzw), quaternion_phone_xyzw
+    )
+    quaternion_phone_to_arm_init = quat_multiply_xyzw(
+        quat_conjugate_xyzw(quaternion_arm_init_xyzw), quaternion_phone_init_xyzw
     )
 
+    # Compute delta rotation: how the phone rotated since calibration, expressed in the lower arm frame
+    x, y, z, w = quat_multiply_xyzw(
+        quat_conjugate_xyzw(quaternion_phone_to_arm_init), quaternion_phone_to_arm
+    ).tolist()
+
+    # Extract pitch and roll using wrist joint convention (relative to arm).
+    # Only the rotation matrix elements needed by the angles are computed.
+    m00 = 1.0 - 2.0 * (y * y + z * z)
+    m01 = 2.0 * (x * y - w * z)
+    m02 = 2.0 * (x * z + w * y)
+    m11 = 1.0 - 2.0 * (x * x + z * z)
+    m21 = 2.0 * (y * z + w * x)
+    return _wrist_deltas_syzx(m00, m01, m02, m11, m21)
+
+
+def _wrist_deltas_syzx(m00, m01, m02, m11, m21) -> tuple[float, float]:
+    """
+    Wrist pitch and roll from the elements of the delta rotation matrix M.
+
+    Using "syzx" Euler angles avoid gimbal lock on pitch and roll, the full Euler
+    triple is never computed.
+    """
     # Changes in yaw create gimbal lock issues. We assume that the user moves the phone
     # in such a way that the yaw of the phone is aligned with the yaw of the lower
     # arm (in world coordinates, z up). Basically we are assuming the phone remains
     # aligned with the gripper. When the assumption is broken, we ignore the phone's
     # orientation changes.
-    if abs(rad_delta_yaw) > math.radians(30.0):
+    # For "syzx", sin(yaw) = -M[0, 1], so the check needs no trigonometry.
+    if abs(m01) > math.sin(math.radians(30.0)):
         return 0.0, 0.0
 
+    # Yaw is within 30 degrees, far from the gimbal lock of "syzx"
+    rad_delta_pitch = math.atan2(m02, m00)
+    rad_delta_roll = math.atan2(m21, m11)
     return rad_delta_pitch, rad_delta_roll